@@ -1,33 +1,156 @@
 #!/usr/bin/env python3
 
 import re
+import sys
 import json
 import argparse
-import math
+import functools
+import mmap
+from os import fstat
 from os.path import expanduser, realpath
 from datetime import datetime
-from pytz import timezone
-from jira import JIRA
+from zoneinfo import ZoneInfo
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+@functools.lru_cache(maxsize=None)
+def _get_tz(name):
+    return ZoneInfo(name)
+
+
+_WS_RE = re.compile(r'\s+')
+
+
+def _parse_ticket(s):
+    """Match '<PROJECT>-<number>' (case-insensitive) and return the upper-cased ticket, or None."""
+    s = s.upper()
+    n = len(s)
+    if not n or not ('A' <= s[0] <= 'Z'):
+        return None
+    i = 1
+    while i < n and ('A' <= s[i] <= 'Z' or '0' <= s[i] <= '9'):
+        i += 1
+    if i < 2 or i >= n or s[i] != '-':
+        return None
+    i += 1
+    if i >= n:
+        return None
+    while i < n:
+        if not ('0' <= s[i] <= '9'):
+            return None
+        i += 1
+    return s
+
+
+def _parse_date(s):
+    """Match 'YYYY-MM-DD' or 'YYYYMMDD' and return (year, month, day) ints, or None."""
+    n = len(s)
+    if n == 10:
+        if s[4] != '-' or s[7] != '-':
+            return None
+        year, month, day = s[:4], s[5:7], s[8:10]
+        if not (year.isdigit() and month.isdigit() and day.isdigit()):
+            return None
+        return (int(year), int(month), int(day))
+    if n == 8:
+        if not s.isdigit():
+            return None
+        return (int(s[:4]), int(s[4:6]), int(s[6:8]))
+    return None
+
+
+def _parse_time(s):
+    """Parse a time field into (hours, minutes), or return None.
+
+    Accepts decimal hours ('1.5', '.5h', '3') or hour/minute components
+    ('2h 30m', '2h', '45m'). Zero time is treated as unparseable.
+    """
+    n = len(s)
+    i = 0
+    while i < n and '0' <= s[i] <= '9':
+        i += 1
+    if i == n:
+        # bare digits: whole decimal hours
+        if not i:
+            return None
+        hours = int(s)
+        return (hours, 0) if hours else None
+    if s[i] == '.':
+        # decimal hours, optionally suffixed with 'h'
+        j = i + 1
+        frac_start = j
+        while j < n and '0' <= s[j] <= '9':
+            j += 1
+        if j == frac_start:
+            return None
+        k = j
+        while k < n and s[k] == ' ':
+            k += 1
+        if k < n and not (s[k] in 'hH' and k + 1 == n):
+            return None
+        dec_hours = float(s[:j])
+        hours = int(dec_hours)
+        minutes = int(round((dec_hours - hours) * 60))
+        return (hours, minutes) if hours or minutes else None
+    # hour/minute components
+    hours = 0
+    minutes = 0
+    j = i
+    while j < n and s[j] == ' ':
+        j += 1
+    if i and j < n and s[j] in 'hH':
+        hours = int(s[:i])
+        j += 1
+        while j < n and s[j] == ' ':
+            j += 1
+        k = j
+        while k < n and '0' <= s[k] <= '9':
+            k += 1
+        if k > j:
+            m = k
+            while m < n and s[m] == ' ':
+                m += 1
+            if m < n and s[m] in 'mM':
+                minutes = int(s[j:k])
+    elif i and j < n and s[j] in 'mM':
+        minutes = int(s[:i])
+    if not hours and not minutes:
+        return None
+    return (hours, minutes)
+
+
+class Log:
+    __slots__ = ('date', 'date_str', 'ticket', 'project', 'number', 'hours', 'minutes', 'description')
+
+    def __init__(self, date, date_str, ticket, project, number, hours, minutes, description):
+        self.date = date
+        self.date_str = date_str
+        self.ticket = ticket
+        self.project = project
+        self.number = number
+        self.hours = hours
+        self.minutes = minutes
+        self.description = description
 
 
 class LogJammin:
-    mode = 'date'
     current_date = None
+    current_date_str = None
     parse_only = False
     logs = []
-    tickets = []
+    tickets = set()
     jira = None
     time_zone = None
     now = None
 
     def __init__(self, filename, parse_only):
         self.parse_only = parse_only
+        self._date_cache = {}
 
         try:
             config = self.load_config()
-            self.time_zone = timezone(config['time_zone'])
-            self.now = self.time_zone.localize(datetime.now())
+            self.time_zone = _get_tz(config['time_zone'])
+            self.now = datetime.now(self.time_zone)
             if not filename:
                 if 'log_file' not in config or not config['log_file']:
                     raise Exception('Log file not set')
@@ -37,6 +160,8 @@ class LogJammin:
             self.exit_with_error(e)
 
         if not self.parse_only:
+            # deferred so --parse-only doesn't pay the heavy jira import at startup
+            from jira import JIRA
             print('Connecting to JIRA...', end='', flush=True)
             try:
                 self.jira = JIRA(
@@ -57,6 +182,14 @@ class LogJammin:
         if not len(self.logs):
             self.exit_with_error('No logs found')
 
+        if not self.parse_only:
+            print('Verifying tickets...', end='', flush=True)
+            try:
+                self.assert_tickets_exist()
+            except Exception as e:
+                self.exit_with_error(e)
+            print('\033[92mdone\033[0m')
+
         self.print_summary()
 
         if not self.parse_only:
@@ -67,10 +200,7 @@ class LogJammin:
                 elif run == 'y':
                     break
             try:
-                for (i, log) in enumerate(self.logs):
-                    print('Saving log {}/{}: ({})...'.format(i + 1, len(self.logs), self.format_log(log)), end='', flush=True)
-                    self.upload_log(log)
-                    print('\033[92mdone\033[0m')
+                self.upload_logs()
             except Exception as e:
                 self.exit_with_error(e)
 
@@ -79,63 +209,58 @@ class LogJammin:
     def print_summary(self):
         logs_by_date = OrderedDict()
         total_minutes = 0
-        print('\033[94m{}\033[0m'.format(80 * '='))
+        print(f'\033[94m{80 * "="}\033[0m')
         print('\033[93mSummary:\033[0m')
         for log in self.logs:
-            date = log['date'].strftime('%Y-%m-%d')
+            date = log.date_str
             if date not in logs_by_date:
                 logs_by_date[date] = {
                     'logs': [],
                     'total_time_minutes': 0
                 }
             logs_by_date[date]['logs'].append(log)
-            logs_by_date[date]['total_time_minutes'] += 60 * log['time']['hours']
-            logs_by_date[date]['total_time_minutes'] += log['time']['minutes']
+            logs_by_date[date]['total_time_minutes'] += 60 * log.hours
+            logs_by_date[date]['total_time_minutes'] += log.minutes
 
         for date, summary in logs_by_date.items():
-            print('\n\033[93m{}\033[0m'.format(date))
-            hours = math.floor(summary['total_time_minutes'] / 60)
-            minutes = math.floor(summary['total_time_minutes'] % 60)
+            print(f'\n\033[93m{date}\033[0m')
+            hours = summary['total_time_minutes'] // 60
+            minutes = summary['total_time_minutes'] % 60
             total_minutes += summary['total_time_minutes']
             for log in summary['logs']:
-                time = self.format_time(log['time']['hours'], log['time']['minutes'])
-                description = '({})'.format(log['description']) if log['description'] else ''
-                print('  {}: {} {}'.format(log['ticket'], time, description))
-            print('\033[93mTotal: {} logs, {}\033[0m'.format(len(summary['logs']), self.format_time(hours, minutes)))
+                time = self.format_time(log.hours, log.minutes)
+                description = f'({log.description})' if log.description else ''
+                print(f'  {log.ticket}: {time} {description}')
+            print(f'\033[93mTotal: {len(summary["logs"])} logs, {self.format_time(hours, minutes)}\033[0m')
 
-        summary_hours = math.floor(total_minutes / 60)
-        summary_minutes = math.floor(total_minutes % 60)
+        summary_hours = total_minutes // 60
+        summary_minutes = total_minutes % 60
         print(
-            '\n\033[93mSum Total: {} days, {} logs, {}\033[0m'.format(
-                len(logs_by_date),
-                len(self.logs),
-                self.format_time(summary_hours, summary_minutes)
-            )
+            f'\n\033[93mSum Total: {len(logs_by_date)} days, {len(self.logs)} logs, '
+            f'{self.format_time(summary_hours, summary_minutes)}\033[0m'
         )
-        print('\033[94m{}\033[0m'.format(80 * '='))
+        print(f'\033[94m{80 * "="}\033[0m')
 
     def exit_with_success(self):
         print('\033[92mDone\033[0m')
         exit()
 
     def exit_with_error(self, e):
-        print('\n\033[91m{}\033[0m'.format(str(e)))
+        print(f'\n\033[91m{e}\033[0m')
         exit(1)
 
     def format_log(self, log):
-        return 'date={}, ticket={}, time={}, description={}'.format(
-            log['date'].strftime('%Y-%m-%d'),
-            log['ticket'],
-            self.format_time(log['time']['hours'], log['time']['minutes']),
-            log['description']
+        return (
+            f'date={log.date_str}, ticket={log.ticket}, '
+            f'time={self.format_time(log.hours, log.minutes)}, description={log.description}'
         )
 
     def format_time(self, hours, minutes):
         time_str = ''
         if hours:
-            time_str += '{}h '.format(hours)
+            time_str += f'{hours}h '
         if minutes:
-            time_str += '{}m'.format(minutes)
+            time_str += f'{minutes}m'
         return time_str.strip()
 
     def load_config(self):
@@ -145,89 +270,98 @@ class LogJammin:
                 config = json.load(f)
             for key in required_keys:
                 if key not in config:
-                    raise Exception('missing key \'{}\''.format(key))
+                    raise Exception(f'missing key \'{key}\'')
             return config
         except Exception as e:
-            raise Exception('Error parsing ~/.logjammin: {}'.format(e)) from None
+            raise Exception(f'Error parsing ~/.logjammin: {e}') from None
 
     def load_logs(self, filename):
         line_no = 0
         loading_pct = 0
-        with open(filename, 'r') as fp:
-            lines = fp.read().splitlines()
-        for line in lines:
-            line_no += 1
-            stripped_line = line.strip()
-            if not len(stripped_line):
-                continue
-            if stripped_line.startswith('//') or stripped_line.startswith('#'):
-                continue
-            try:
-                self.parse_line(stripped_line)
-            except Exception as e:
-                raise Exception('Error on line {}: {}'.format(line_no, str(e))) from None
-            prev_loading_pct = loading_pct
-            loading_pct = math.floor(line_no / len(lines) * 100)
-            print(
-                '{}{}%'.format(
-                    '\b' * (len(str(prev_loading_pct)) + 1 if prev_loading_pct else 0),
-                    loading_pct
-                ),
-                end='',
-                flush=True
-            )
-        if len(lines):
-            print('\b' * 4, end='', flush=True) # 100%
-        self.logs.sort(key=lambda k: (k['date'], k['ticket'].split('-')[0], int(k['ticket'].split('-')[1])))
+        with open(filename, 'rb') as fp:
+            if not fstat(fp.fileno()).st_size:
+                return
+            with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                size = mm.size()
+                # bind hot-loop lookups to locals; LOAD_FAST beats repeated attribute lookups
+                parse_line = self.parse_line
+                tell = mm.tell
+                write = sys.stdout.write
+                flush = sys.stdout.flush
+                for raw_line in iter(mm.readline, b''):
+                    line_no += 1
+                    stripped_line = raw_line.decode('utf-8').strip()
+                    if not len(stripped_line):
+                        continue
+                    if stripped_line.startswith('//') or stripped_line.startswith('#'):
+                        continue
+                    try:
+                        parse_line(stripped_line)
+                    except Exception as e:
+                        raise Exception(f'Error on line {line_no}: {e}') from None
+                    prev_loading_pct = loading_pct
+                    loading_pct = tell() * 100 // size
+                    if loading_pct != prev_loading_pct:
+                        backspaces = '\b' * (len(str(prev_loading_pct)) + 1 if prev_loading_pct else 0)
+                        write(f'{backspaces}{loading_pct}%')
+                        flush()
+        if line_no:
+            sys.stdout.write('\b' * 4) # 100%
+            sys.stdout.flush()
+        self.logs.sort(key=lambda k: (k.date, k.project, k.number))
+
+    def upload_logs(self):
+        saved = 0
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = {executor.submit(self.upload_log, log): log for log in self.logs}
+            for future in as_completed(futures):
+                log = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    raise Exception(f'Failed to save log ({self.format_log(log)}): {e}') from None
+                saved += 1
+                print(f'Saved log {saved}/{len(self.logs)}: ({self.format_log(log)})...\033[92mdone\033[0m')
 
     def upload_log(self, log):
-        time_spent = '{}h {}m'.format(log['time']['hours'], log['time']['minutes'])
+        time_spent = f'{log.hours}h {log.minutes}m'
 
-        kwargs = {'comment': log['description']} if log['description'] else {}
+        kwargs = {'comment': log.description} if log.description else {}
 
         self.jira.add_worklog(
-            issue=log['ticket'],
+            issue=log.ticket,
             timeSpent=time_spent,
-            started=log['date'],
+            started=log.date,
             **kwargs
         )
 
     def parse_line(self, line):
-        normalized_line = re.sub(r'\s+', ' ', line.strip())
-        if self.mode == 'date':
-            try:
-                self.current_date = self.parse_date_line(normalized_line)
-                self.mode = 'time_log'
-            except Exception as e:
-                raise Exception('String \'{}\' is invalid: {}'.format(line, str(e))) from None
-        elif self.mode == 'time_log':
+        normalized_line = _WS_RE.sub(' ', line.strip())
+        # time log lines always contain a comma (ticket, time); date lines never do
+        if ',' in normalized_line:
             try:
+                if self.current_date is None:
+                    raise Exception('No date line seen yet')
                 ticket, time, description = self.parse_time_log_line(normalized_line)
                 self.add_log(ticket, time, description)
-                self.mode = 'date_or_time_log'
             except Exception as e:
-                raise Exception('String \'{}\' is invalid: {}'.format(line, e)) from None
-        elif self.mode == 'date_or_time_log':
+                raise Exception(f'String \'{line}\' is invalid: {e}') from None
+        else:
             try:
-                self.mode = 'date'
-                return self.parse_line(line)
+                self.current_date = self.parse_date_line(normalized_line)
+                self.current_date_str = self.current_date.strftime('%Y-%m-%d')
             except Exception as e:
-                try:
-                    self.mode = 'time_log'
-                    return self.parse_line(line)
-                except Exception as e:
-                    raise Exception('String \'{}\' is invalid: {}'.format(line, str(e))) from None
-        else:
-            raise Exception('Invalid mode \'{}\''.format(self.mode))
+                raise Exception(f'String \'{line}\' is invalid: {e}') from None
 
     def parse_date_line(self, line):
-        date_match = re.match(r'^(?P<year>\d{4})-?(?P<month>\d{2})-?(?P<day>\d{2})$', line)
-        if not date_match:
+        key = _parse_date(line)
+        if not key:
             raise Exception('Pattern not matched')
 
-        date = self.time_zone.localize(
-            datetime(int(date_match.group('year')), int(date_match.group('month')), int(date_match.group('day')))
-        )
+        date = self._date_cache.get(key)
+        if date is None:
+            date = datetime(*key, tzinfo=self.time_zone)
+            self._date_cache[key] = date
         if date > self.now:
             raise Exception('Date is in the future')
         return date
@@ -238,57 +372,45 @@ class LogJammin:
         time_str = parts[1].strip() if len(parts) > 1 else ''
         description = parts[2].strip() if len(parts) > 2 else ''
 
-        ticket_match_re = r'^[A-Z][A-Z0-9]+-\d+$'
-        ticket_match = re.match(ticket_match_re, ticket_str, re.IGNORECASE)
-        if not ticket_match:
+        ticket = _parse_ticket(ticket_str)
+        if not ticket:
             raise Exception('Ticket pattern not matched')
-        ticket = ticket_match.group(0).upper()
 
-        hours = 0
-        minutes = 0
-
-        dec_hours_match_re = '^(\d+\.\d+|\.\d+|\d+)\s*H?$'
-        dec_hours_match = re.match(dec_hours_match_re, time_str, re.IGNORECASE)
-        if dec_hours_match:
-            dec_hours = float(dec_hours_match.group(1))
-            hours = math.floor(dec_hours)
-            minutes = math.floor(60 * (dec_hours % 1))
-        else:
-            hours_mins_match_re = r'((?P<hours>\d+)\s*H)?\s*((?P<minutes>\d+)\s*M)?'
-            hours_mins_match = re.match(hours_mins_match_re, time_str, re.IGNORECASE)
-            if hours_mins_match:
-                hours = int(hours_mins_match.group('hours') or 0)
-                minutes = int(hours_mins_match.group('minutes') or 0)
-
-        if not hours and not minutes:
+        time = _parse_time(time_str)
+        if time is None:
             raise Exception('Time pattern not matched')
 
-        if not self.parse_only:
-            self.assert_ticket_exists(ticket)
-
-        time = (hours, minutes)
+        self.tickets.add(ticket)
 
         return (ticket, time, description)
 
-    def assert_ticket_exists(self, ticket):
-        if ticket in self.tickets:
+    def assert_tickets_exist(self):
+        if not self.tickets:
             return
         try:
-            self.jira.issue(ticket, fields='key')
-            self.tickets.append(ticket)
+            issues = self.jira.search_issues(
+                f'key in ({",".join(sorted(self.tickets))})',
+                fields='key',
+                maxResults=len(self.tickets)
+            )
         except Exception as e:
-            raise Exception('Failed to get ticket info for {}'.format(ticket)) from None
+            raise Exception(f'Failed to get ticket info: {e}') from None
+        missing = self.tickets - {issue.key for issue in issues}
+        if missing:
+            raise Exception(f'Failed to get ticket info for {", ".join(sorted(missing))}')
 
     def add_log(self, ticket, time, description):
-        self.logs.append({
-            'date': self.current_date,
-            'ticket': ticket,
-            'description': description,
-            'time': {
-                'hours': time[0],
-                'minutes': time[1]
-            }
-        })
+        project, number = ticket.split('-', 1)
+        self.logs.append(Log(
+            date=self.current_date,
+            date_str=self.current_date_str,
+            ticket=ticket,
+            project=project,
+            number=int(number),
+            hours=time[0],
+            minutes=time[1],
+            description=description
+        ))
 
 parser = argparse.ArgumentParser()
 parser.add_argument('file', type=str, help='the file to load', nargs='?')